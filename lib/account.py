@@ -1,13 +1,22 @@
-from typing import Any, Dict, List
+from __future__ import annotations
+
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple, Union
 
 import apprise
 
+from .checkin_scheduler import CheckInScheduler
 from .config import Config
 from .flight import Flight
-from .general import CheckInError, NotificationLevel, make_request
-from .webdriver import WebDriver
+from .general import CheckInError, NotificationLevel, create_session, make_request
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .webdriver import WebDriver
 
 VIEW_RESERVATION_URL = "mobile-air-booking/v1/mobile-air-booking/page/view-reservation/"
+MAX_RESERVATION_WORKERS = 8
 
 
 class Account:
@@ -17,49 +26,134 @@ class Account:
         password: str = None,
         first_name: str = None,
         last_name: str = None,
+        checkin_scheduler: CheckInScheduler = None,
     ) -> None:
         self.username = username
         self.password = password
         self.first_name = first_name
         self.last_name = last_name
         self.flights: List[Flight] = []
+        self._scheduled_flights: Set[Tuple[datetime, str, str]] = set()
         self.headers: Dict[str, Any] = {}
         self.config = Config()
+        self.session = create_session()
+        self._webdriver: WebDriver = None
+
+        # A scheduler can be provided instead of creating one for this account
+        if checkin_scheduler is None:
+            checkin_scheduler = CheckInScheduler(self)
+        self.checkin_scheduler = checkin_scheduler
+
+        # The Apprise object is only rebuilt when the notification URLs change
+        self._apprise: apprise.Apprise = None
+        self._apprise_urls: Union[List[str], str] = None
+
+        # Notifications are collected here instead of being sent right away while batching
+        self._notification_batch: List[Tuple[str, int]] = None
 
     def get_flights(self) -> None:
+        self.remove_departed_flights()
         prev_flight_len = len(self.flights)
 
-        webdriver = WebDriver()
-        reservations = webdriver.get_info(self)
+        self._notification_batch = []
+        try:
+            reservations = self._get_webdriver().get_info(self)
 
-        for reservation in reservations:
-            confirmation_number = reservation["confirmationNumber"]
-            self._get_reservation_info(confirmation_number)
+            confirmation_numbers = [
+                reservation["confirmationNumber"] for reservation in reservations
+            ]
+            self._get_all_reservation_info(confirmation_numbers)
+
+            self._send_new_flight_notifications(prev_flight_len)
+        finally:
+            self.flush_notifications()
 
-        self._send_new_flight_notifications(prev_flight_len)
+        # This has to happen before the scheduler starts. Otherwise, a refresh that became due
+        # while retrieving the flights could be using the browser when it is closed.
+        self.checkin_scheduler.close_idle_webdriver()
+        self.checkin_scheduler.start()
 
     def get_checkin_info(self, confirmation_number: str) -> None:
+        self.remove_departed_flights()
         prev_flight_len = len(self.flights)
 
-        self.refresh_headers()
-        self._get_reservation_info(confirmation_number)
+        self._notification_batch = []
+        try:
+            self.refresh_headers()
+            self._get_reservation_info(confirmation_number)
 
-        self._send_new_flight_notifications(prev_flight_len)
+            self._send_new_flight_notifications(prev_flight_len)
+        finally:
+            self.flush_notifications()
+
+        # This has to happen before the scheduler starts. Otherwise, a refresh that became due
+        # while retrieving the flights could be using the browser when it is closed.
+        self.checkin_scheduler.close_idle_webdriver()
+        self.checkin_scheduler.start()
+
+    # Blocks until every scheduled check in for this account has finished
+    def wait_for_check_ins(self) -> None:
+        self.checkin_scheduler.wait()
+        self.close()
+
+    # Closes the browser if one is open. It will be started again if it is needed later
+    def close(self) -> None:
+        if self._webdriver is not None:
+            self._webdriver.quit()
+
+    def remove_departed_flights(self) -> None:
+        current_time = datetime.utcnow()
+        self.flights = [flight for flight in self.flights if flight.departure_time >= current_time]
+        self._scheduled_flights = {self._get_flight_key(flight) for flight in self.flights}
 
     def refresh_headers(self) -> None:
-        webdriver = WebDriver()
-        self.headers = webdriver.get_info()
+        self.headers = self._get_webdriver().get_info()
+
+    def _get_webdriver(self) -> WebDriver:
+        if self._webdriver is None:
+            # Selenium takes longer to import than everything else combined, so it is
+            # only imported once a browser is actually needed
+            from .webdriver import WebDriver
+
+            self._webdriver = WebDriver()
+
+        return self._webdriver
+
+    # Every reservation is retrieved at the same time, but the flights are still
+    # scheduled one at a time so the flight list is only modified by one thread
+    def _get_all_reservation_info(self, confirmation_numbers: List[str]) -> None:
+        if len(confirmation_numbers) == 0:
+            return
+
+        max_workers = min(MAX_RESERVATION_WORKERS, len(confirmation_numbers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(self._fetch_reservation, confirmation_numbers))
+
+        for confirmation_number, response in zip(confirmation_numbers, responses):
+            self._process_reservation(confirmation_number, response)
 
     def _get_reservation_info(self, confirmation_number: str) -> None:
+        response = self._fetch_reservation(confirmation_number)
+        self._process_reservation(confirmation_number, response)
+
+    # The error is returned instead of raised so it can be reported when the
+    # reservation is processed
+    def _fetch_reservation(self, confirmation_number: str) -> Union[Dict[str, Any], CheckInError]:
         info = {"first-name": self.first_name, "last-name": self.last_name}
         site = VIEW_RESERVATION_URL + confirmation_number
 
         try:
-            response = make_request("GET", site, self.headers, info)
+            return make_request("GET", site, self.headers, info, self.session)
         except CheckInError as err:
+            return err
+
+    def _process_reservation(
+        self, confirmation_number: str, response: Union[Dict[str, Any], CheckInError]
+    ) -> None:
+        if isinstance(response, CheckInError):
             error_message = (
                 f"Failed to retrieve reservation for {self.first_name} {self.last_name} "
-                f"with confirmation number {confirmation_number}. Reason: {err}.\n"
+                f"with confirmation number {confirmation_number}. Reason: {response}.\n"
                 f"Make sure the flight information is correct and try again.\n"
             )
             self.send_notification(error_message, NotificationLevel.ERROR)
@@ -70,11 +164,23 @@ class Account:
         flight_info = response["viewReservationViewPage"]["bounds"]
 
         for flight in flight_info:
-            # if not flight in self.flights: // TODO: This doesn't work. Add a function to make sure it only schedules if it isn't already added
             if flight["departureStatus"] != "DEPARTED":
                 flight = Flight(self, confirmation_number, flight)
+
+                # Don't schedule the same flight twice
+                if self._flight_is_scheduled(flight):
+                    continue
+
                 self.flights.append(flight)
-                # TODO: Remove flight from list after it has checked in. Have to do in main process (memory isn't shared)
+                self._scheduled_flights.add(self._get_flight_key(flight))
+                self.checkin_scheduler.schedule_check_in(flight)
+
+    def _flight_is_scheduled(self, flight: Flight) -> bool:
+        return self._get_flight_key(flight) in self._scheduled_flights
+
+    @staticmethod
+    def _get_flight_key(flight: Flight) -> Tuple[datetime, str, str]:
+        return (flight.departure_time, flight.departure_airport, flight.destination_airport)
 
     # Sends new flight notifications to the user. It detects new flights by getting every scheduled flight after
     # the previous length of the flights list.
@@ -83,10 +189,15 @@ class Account:
             # Don't send any notifications if no new flights have been scheduled
             return
 
-        flight_schedule_message = f"Successfully scheduled the following flights to check in for {self.first_name} {self.last_name}:\n"
-        for flight in self.flights[prev_flight_len:]:
-            flight_schedule_message += f"Flight from {flight.departure_airport} to {flight.destination_airport} at {flight.departure_time} UTC\n"
+        lines = [
+            f"Successfully scheduled the following flights to check in for {self.first_name} {self.last_name}:\n"
+        ]
+        lines.extend(
+            f"Flight from {flight.departure_airport} to {flight.destination_airport} at {flight.departure_time} UTC\n"
+            for flight in self.flights[prev_flight_len:]
+        )
 
+        flight_schedule_message = "".join(lines)
         self.send_notification(flight_schedule_message, NotificationLevel.INFO)
 
     def send_notification(self, body: str, level: int = None) -> None:
@@ -99,7 +210,33 @@ class Account:
         if level and level < self.config.notification_level:
             return
 
+        if self._notification_batch is not None:
+            self._notification_batch.append((body, level))
+            return
+
+        self._notify(body)
+
+    # Sends every batched notification in a single message. Errors are placed first
+    # so they aren't buried under the informational messages.
+    def flush_notifications(self) -> None:
+        notifications = self._notification_batch
+        self._notification_batch = None
+
+        if not notifications:
+            return
+
+        notifications.sort(key=lambda notification: notification[1] or 0, reverse=True)
+        self._notify("\n".join(body for body, _ in notifications))
+
+    def _notify(self, body: str) -> None:
         title = "Auto Southwest Check-in Script"
 
-        apobj = apprise.Apprise(self.config.notification_urls)
+        apobj = self._get_apprise()
         apobj.notify(title=title, body=body, body_format=apprise.NotifyFormat.TEXT)
+
+    def _get_apprise(self) -> apprise.Apprise:
+        if self._apprise is None or self.config.notification_urls != self._apprise_urls:
+            self._apprise = apprise.Apprise(self.config.notification_urls)
+            self._apprise_urls = copy.copy(self.config.notification_urls)
+
+        return self._apprise
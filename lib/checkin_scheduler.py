@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import heapq
+import sched
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List
+
+from .general import NotificationLevel
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .account import Account
+    from .flight import Flight
+
+# Headers are refreshed this long before a check in to make sure they are valid
+HEADER_REFRESH_TIME = timedelta(minutes=10)
+
+# Check ins that are close together share one header refresh, so a browser
+# doesn't have to be started for every flight in the same trip
+REFRESH_WINDOW = timedelta(minutes=15)
+
+# The browser is closed if it won't be needed to refresh headers within this time
+WEBDRIVER_IDLE_TIME = timedelta(minutes=30)
+
+
+# Every check in for an account is scheduled from a single thread instead of
+# starting a new process for every flight
+class CheckInScheduler:
+    def __init__(self, account: Account) -> None:
+        self.account = account
+        self.scheduler = sched.scheduler(time.time, time.sleep)
+        self.thread: threading.Thread = None
+        self.checkin_threads: List[threading.Thread] = []
+        self.refresh_events: List[sched.Event] = []
+
+        # The time of every pending refresh mapped to the latest refresh it covers
+        self.latest_refreshes: Dict[float, float] = {}
+
+    def schedule_check_in(self, flight: Flight) -> None:
+        # Everything is scheduled with timestamps, so the check in time is only converted once
+        checkin_timestamp = self._get_timestamp(flight.checkin_time)
+        current_timestamp = time.time()
+        if checkin_timestamp <= current_timestamp:
+            self.scheduler.enter(0, 1, self._check_in, (flight,))
+            return
+
+        print(
+            f"Scheduling checkin to flight from '{flight.departure_airport}' to '{flight.destination_airport}' "
+            f"for {self.account.first_name} {self.account.last_name} at {flight.checkin_time} UTC\n"
+        )
+
+        # Refresh headers 10 minutes before to make sure they are valid. Only try to
+        # refresh the headers if the checkin is more than ten minutes away
+        refresh_timestamp = checkin_timestamp - HEADER_REFRESH_TIME.total_seconds()
+        if refresh_timestamp > current_timestamp:
+            self._schedule_refresh(refresh_timestamp)
+
+        self.scheduler.enterabs(checkin_timestamp, 1, self._check_in, (flight,))
+
+    # Starts running the scheduled check ins if they aren't already running
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.thread = threading.Thread(target=self.scheduler.run, daemon=True)
+        self.thread.start()
+
+    # Blocks until every scheduled check in has finished
+    def wait(self) -> None:
+        if self.thread is not None:
+            self.thread.join()
+
+        for thread in self.checkin_threads:
+            thread.join()
+
+    # Keeps the browser open only if a header refresh will need it again soon
+    def close_idle_webdriver(self) -> None:
+        idle_time = WEBDRIVER_IDLE_TIME.total_seconds()
+        current_time = time.time()
+        for event in self.refresh_events:
+            if event.time - current_time <= idle_time:
+                return
+
+        self.account.close()
+
+    # Only schedules a header refresh if no pending refresh will happen at most
+    # REFRESH_WINDOW before this one. Pending refreshes after this one are replaced by it
+    # if every check in they cover is still within REFRESH_WINDOW of this refresh, so check
+    # ins that are scheduled out of order still share a refresh.
+    def _schedule_refresh(self, refresh_timestamp: float) -> None:
+        window = REFRESH_WINDOW.total_seconds()
+        for event in self.refresh_events:
+            if 0 <= refresh_timestamp - event.time <= window:
+                self.latest_refreshes[event.time] = max(
+                    self.latest_refreshes[event.time], refresh_timestamp
+                )
+                return
+
+        latest_refresh = refresh_timestamp
+        for event in list(self.refresh_events):
+            covered_refresh = self.latest_refreshes[event.time]
+            if event.time > refresh_timestamp and covered_refresh - refresh_timestamp <= window:
+                self.scheduler.cancel(event)
+                self.refresh_events.remove(event)
+                del self.latest_refreshes[event.time]
+                latest_refresh = max(latest_refresh, covered_refresh)
+        heapq.heapify(self.refresh_events)
+
+        event = self.scheduler.enterabs(refresh_timestamp, 0, self._refresh_headers)
+        heapq.heappush(self.refresh_events, event)
+        self.latest_refreshes[refresh_timestamp] = latest_refresh
+
+    # Every event runs on the scheduler's thread, so an error here has to be caught.
+    # Otherwise, it would stop the scheduler and every later check in would be skipped.
+    def _refresh_headers(self) -> None:
+        # Refreshes run in order, so the earliest pending refresh is the one running
+        event = heapq.heappop(self.refresh_events)
+        del self.latest_refreshes[event.time]
+
+        try:
+            self.account.refresh_headers()
+        except Exception as err:  # pylint: disable=broad-except
+            error_message = (
+                f"Failed to refresh headers for {self.account.first_name} {self.account.last_name}. "
+                f"Reason: {err}.\nThe upcoming check ins will use the previous headers\n"
+            )
+
+            self.account.send_notification(error_message, NotificationLevel.ERROR)
+            print(error_message)
+
+        self.close_idle_webdriver()
+
+    # Each check in runs in its own thread so retrying a check in will not delay
+    # any other check ins scheduled around the same time
+    def _check_in(self, flight: Flight) -> None:
+        thread = threading.Thread(target=flight._check_in, daemon=True)
+        self.checkin_threads.append(thread)
+        thread.start()
+
+    # Flight times are stored in UTC without a timezone, so the timezone needs to be
+    # set before converting to a timestamp. Otherwise, it would be treated as local time
+    @staticmethod
+    def _get_timestamp(utc_time: datetime) -> float:
+        return utc_time.replace(tzinfo=timezone.utc).timestamp()
@@ -9,6 +9,10 @@ CONFIG_FILE_NAME = "config.json"
 
 
 class Config:
+    # Every configuration value is declared here so instances don't need a
+    # dictionary for their attributes. A new value has to be added here too.
+    __slots__ = ("notification_urls", "notification_level")
+
     def __init__(self):
         # Default values are set
         self.notification_urls = []
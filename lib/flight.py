@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import functools
 import json
 import os
-import time
 from datetime import datetime, timedelta
-from multiprocessing import Process
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 import pytz
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 from .general import CheckInError, NotificationLevel, make_request
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -19,6 +23,41 @@ MANUAL_CHECKIN_URL = "https://mobile.southwest.com/check-in"
 TZ_FILE_PATH = "utils/airport_timezones.json"
 
 
+def _load_airport_timezones() -> Dict[str, str]:
+    project_dir = os.path.dirname(os.path.dirname(__file__))
+    with open(project_dir + "/" + TZ_FILE_PATH, "rb") as tz:
+        airport_timezones = tz.read()
+
+    # orjson parses the file much faster, but the standard library is used if it isn't installed
+    if orjson is None:
+        return json.loads(airport_timezones)
+
+    return orjson.loads(airport_timezones)
+
+
+# The timezone file is only read once instead of every time a flight is scheduled
+AIRPORT_TIMEZONES = _load_airport_timezones()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_timezone(timezone_name: str) -> Any:
+    return pytz.timezone(timezone_name)
+
+
+# Many airports' timezones no longer observe daylight saving time, so their UTC
+# offset is the same for every flight and only has to be found once
+@functools.lru_cache(maxsize=None)
+def _get_constant_offset(airport_timezone: Any) -> Optional[timedelta]:
+    current_time = datetime.utcnow()
+
+    # Timezones without any transitions, such as UTC, don't have this attribute
+    transitions = getattr(airport_timezone, "_utc_transition_times", [])
+    if len(transitions) > 0 and transitions[-1] > current_time:
+        return None
+
+    return airport_timezone.utcoffset(current_time)
+
+
 class Flight:
     def __init__(self, account: Account, confirmation_number: str, flight: Dict[str, Any]) -> None:
         self.account = account
@@ -26,68 +65,51 @@ class Flight:
         self.departure_time: datetime = None
         self.departure_airport: str = None
         self.destination_airport: str = None
+        self.checkin_time: datetime = None
         self._get_flight_info(flight)
 
-        process = Process(target=self._set_check_in)
-        process.start()
-
     def _get_flight_info(self, flight: Dict[str, Any]) -> None:
         self.departure_airport = flight["departureAirport"]["name"]
         self.destination_airport = flight["arrivalAirport"]["name"]
         self.departure_time = self._get_flight_time(flight)
 
+        # Starts to check in one second early in case the Southwest server is ahead of your server
+        self.checkin_time = self.departure_time - timedelta(days=1, seconds=1)
+
     def _get_flight_time(self, flight: Dict[str, Any]) -> datetime:
-        flight_date = f"{flight['departureDate']} {flight['departureTime']}"
-        departure_airport_code = flight["departureAirport"]["code"]
-        airport_timezone = self._get_airport_timezone(departure_airport_code)
-        flight_time = self._convert_to_utc(flight_date, airport_timezone)
+        return self._get_utc_time(
+            flight["departureDate"], flight["departureTime"], flight["departureAirport"]["code"]
+        )
+
+    # The same reservation is retrieved every time an account's flights are checked, so the
+    # conversion is cached instead of being done again for the same flight
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _get_utc_time(departure_date: str, departure_time: str, airport_code: str) -> datetime:
+        flight_date = f"{departure_date} {departure_time}"
+        airport_timezone = Flight._get_airport_timezone(airport_code)
+        flight_time = Flight._convert_to_utc(flight_date, airport_timezone)
 
         return flight_time
 
     @staticmethod
     def _get_airport_timezone(airport_code: str) -> Any:
-        project_dir = os.path.dirname(os.path.dirname(__file__))
-        with open(project_dir + "/" + TZ_FILE_PATH) as tz:
-            airport_timezones = json.load(tz)
-
-        airport_timezone = pytz.timezone(airport_timezones[airport_code])
-        return airport_timezone
+        return _get_timezone(AIRPORT_TIMEZONES[airport_code])
 
     @staticmethod
     def _convert_to_utc(flight_date: str, airport_timezone: Any) -> datetime:
-        flight_date = datetime.strptime(flight_date, "%Y-%m-%d %H:%M")
-        flight_time = airport_timezone.localize(flight_date)
-        utc_time = flight_time.astimezone(pytz.utc).replace(tzinfo=None)
-
-        return utc_time
-
-    def _set_check_in(self) -> None:
-        # Starts to check in five seconds early in case the Southwest server is ahead of your server
-        checkin_time = self.departure_time - timedelta(days=1, seconds=1)
-        self._wait_for_check_in(checkin_time)
-        self._check_in()
+        local_time = datetime.fromisoformat(flight_date)
 
-    def _wait_for_check_in(self, checkin_time: datetime) -> None:
-        current_time = datetime.utcnow()
-        if checkin_time <= current_time:
-            return
-
-        print(
-            f"Scheduling checkin to flight from '{self.departure_airport}' to '{self.destination_airport}' "
-            f"for {self.account.first_name} {self.account.last_name} at {checkin_time} UTC\n"
-        )
+        utc_offset = _get_constant_offset(airport_timezone)
+        if utc_offset is None:
+            # The offset is found for the exact local time because it can change partway through
+            # the day. Times that are ambiguous or don't exist during the change are treated as
+            # standard time.
+            utc_offset = airport_timezone.utcoffset(local_time, is_dst=False)
 
-        # Refresh headers 10 minutes before to make sure they are valid
-        sleep_time = (checkin_time - current_time - timedelta(minutes=10)).total_seconds()
+        utc_time = local_time - utc_offset
 
-        # Only try to refresh the headers if the checkin is more than ten minutes away
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-            self.account.refresh_headers()
-
-        current_time = datetime.utcnow()
-        sleep_time = (checkin_time - current_time).total_seconds()
-        time.sleep(sleep_time)
+        return utc_time
 
     def _check_in(self) -> None:
         account_name = f"{self.account.first_name} {self.account.last_name}"
@@ -104,12 +126,12 @@ class Flight:
         site = CHECKIN_URL + self.confirmation_number
 
         try:
-            response = make_request("GET", site, headers, info)
+            response = make_request("GET", site, headers, info, self.account.session)
 
             info = response["checkInViewReservationPage"]["_links"]["checkIn"]
             site = f"mobile-air-operations{info['href']}"
 
-            reservation = make_request("POST", site, headers, info["body"])
+            reservation = make_request("POST", site, headers, info["body"], self.account.session)
         except CheckInError as err:
             error_message = (
                 f"Failed to check in to flight {self.confirmation_number} for {account_name}. "
@@ -124,14 +146,16 @@ class Flight:
 
     # Sends the results to the console and any notification services if they are enabled
     def _send_results(self, boarding_pass: Dict[str, Any]) -> None:
-        success_message = (
+        lines = [
             f"Successfully checked in to flight from '{self.departure_airport}' to "
             f"'{self.destination_airport}' for {self.account.first_name} {self.account.last_name}!\n"
+        ]
+        lines.extend(
+            f"{passenger['name']} got {passenger['boardingGroup']}{passenger['boardingPosition']}!\n"
+            for flight in boarding_pass["flights"]
+            for passenger in flight["passengers"]
         )
 
-        for flight in boarding_pass["flights"]:
-            for passenger in flight["passengers"]:
-                success_message += f"{passenger['name']} got {passenger['boardingGroup']}{passenger['boardingPosition']}!\n"
-
+        success_message = "".join(lines)
         self.account.send_notification(success_message, NotificationLevel.INFO)
         print(success_message)
@@ -3,14 +3,33 @@ from enum import IntEnum
 from typing import Any, Dict
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "https://mobile.southwest.com/api/"
 
 
+# A session reuses connections to Southwest between requests instead of
+# starting a new TCP and TLS connection for every request
+def create_session() -> requests.Session:
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
 def make_request(
-    method: str, site: str, headers: Dict[str, Any], info: Dict[str, str]
+    method: str,
+    site: str,
+    headers: Dict[str, Any],
+    info: Dict[str, str],
+    session: requests.Session = None,
 ) -> Dict[str, Any]:
     url = BASE_URL + site
+    requester = requests if session is None else session
 
     # In the case that your server and the Southwest server aren't in sync,
     # this requests multiple times for a better chance at success when checking in
@@ -18,9 +37,9 @@ def make_request(
     while attempts < 2000:
         print(attempts)
         if method == "POST":
-            response = requests.post(url, headers=headers, json=info)
+            response = requester.post(url, headers=headers, json=info)
         else:
-            response = requests.get(url, headers=headers, params=info)
+            response = requester.get(url, headers=headers, params=info)
 
         if response.status_code == 200:
             return response.json()
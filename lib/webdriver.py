@@ -20,25 +20,44 @@ TRIPS_URL = BASE_URL + "/api/mobile-misc/v1/mobile-misc/page/upcoming-trips"
 CHECKIN_URL = BASE_URL + "/check-in"
 RESERVATION_URL = BASE_URL + "/api/mobile-air-operations/v1/mobile-air-operations/page/check-in/"
 
+# Compiled once so the pattern isn't looked up again for every request header
+NEEDED_HEADERS = re.compile(r"x-api-key|x-channel-id|user-agent|^[\w-]+?-\w$", re.I)
+
 
 class WebDriver:
+    def __init__(self) -> None:
+        # The browser is kept open between calls so it only has to be started once
+        self.driver: Chrome = None
+
     # This is heavily based off of https://github.com/byalextran/southwest-headers/commit/d2969306edb0976290bfa256d41badcc9698f6ed
     def get_info(self, account: Account = None) -> Dict[str, Any]:
-        options = self._get_options()
-        seleniumwire_options = {"disable_encoding": True}
+        driver = self._get_driver()
 
-        driver = Chrome(options=options, seleniumwire_options=seleniumwire_options)
-        driver.scopes = [LOGIN_URL, TRIPS_URL, RESERVATION_URL]  # Filter out unneeded URLs
+        # Clear the requests from any previous calls so only the new requests are read
+        del driver.requests
 
         if account is None:
             info = self._get_checkin_info(driver)
         else:
             info = self._get_account_info(account, driver)
 
-        driver.quit()
-
         return info
 
+    def quit(self) -> None:
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+    def _get_driver(self) -> Chrome:
+        if self.driver is None:
+            options = self._get_options()
+            seleniumwire_options = {"disable_encoding": True}
+
+            self.driver = Chrome(options=options, seleniumwire_options=seleniumwire_options)
+            self.driver.scopes = [LOGIN_URL, TRIPS_URL, RESERVATION_URL]  # Filter out unneeded URLs
+
+        return self.driver
+
     def _get_checkin_info(self, driver: Chrome) -> Dict[str, Any]:
         driver.get(CHECKIN_URL)
 
@@ -122,10 +141,12 @@ class WebDriver:
 
     @staticmethod
     def _get_needed_headers(request_headers: Dict[str, Any]) -> Dict[str, Any]:
-        headers = {}
-        for header in request_headers:
-            if re.match(r"x-api-key|x-channel-id|user-agent|^[\w-]+?-\w$", header, re.I):
-                headers[header] = request_headers[header]
+        matches_needed_header = NEEDED_HEADERS.match
+        headers = {
+            header: request_headers[header]
+            for header in request_headers
+            if matches_needed_header(header)
+        }
 
         return headers
 
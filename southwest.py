@@ -17,6 +17,7 @@ def set_up(arguments: List[str]):
 
         account = Account(username, password)
         account.get_flights()
+        account.wait_for_check_ins()
     elif len(arguments) == 3:
         confirmation_number = arguments[0]
         first_name = arguments[1]
@@ -24,6 +25,7 @@ def set_up(arguments: List[str]):
 
         account = Account(first_name=first_name, last_name=last_name)
         account.get_checkin_info(confirmation_number)
+        account.wait_for_check_ins()
     else:
         print("Invalid arguments")  # TODO: Send reference on how to use the script
 
@@ -0,0 +1,29 @@
+import copy
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lib.config import Config
+
+
+# No test should ever actually sleep. The length of every sleep is recorded instead
+# so tests can still check how long the code would have slept for.
+@pytest.fixture(autouse=True)
+def sleep_calls(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    calls = []
+    monkeypatch.setattr("time.sleep", calls.append)
+    return calls
+
+
+# The configuration file is only read once per module instead of every time an
+# account is created
+@pytest.fixture(scope="module")
+def config_prototype() -> Config:
+    return Config()
+
+
+# Every account gets its own copy of the configuration so tests can change it freely
+@pytest.fixture(autouse=True)
+def account_config(mocker: MockerFixture, config_prototype: Config) -> None:
+    mocker.patch("lib.account.Config", side_effect=lambda: copy.deepcopy(config_prototype))
@@ -1,51 +1,143 @@
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional
 from unittest import mock
 
 import apprise
+import pytest
 from pytest_mock import MockerFixture
 
 from lib.account import Account
+from lib.checkin_scheduler import CheckInScheduler
+from lib.flight import Flight
 from lib.general import CheckInError, NotificationLevel
 from lib.webdriver import WebDriver
 
 # This needs to be accessed to be tested
 # pylint: disable=protected-access
 
+CONFIRMATION_NUMBERS = ("flight1", "flight2")
 
-def test_get_flights_processes_retrieved_flights(mocker: MockerFixture) -> None:
-    mocker.patch.object(
-        WebDriver,
-        "get_info",
-        return_value=[{"confirmationNumber": "flight1"}, {"confirmationNumber": "flight2"}],
+
+# Flights, requests, the browser, and the check in thread are stubbed for every test
+# so none of them are used for real. Tests that depend on their behavior patch them
+# again themselves.
+@pytest.fixture(autouse=True)
+def mock_external_calls(mocker: MockerFixture, patch_get_info: Callable[..., mock.Mock]) -> None:
+    mocker.patch("lib.account.Flight")
+    mocker.patch("lib.account.make_request")
+    patch_get_info(return_value={})
+    mocker.patch.object(CheckInScheduler, "start")
+
+
+# Patches the information retrieved from the browser with the given mock arguments
+@pytest.fixture
+def patch_get_info(mocker: MockerFixture) -> Callable[..., mock.Mock]:
+    def _patch_get_info(**kwargs: Any) -> mock.Mock:
+        return mocker.patch.object(WebDriver, "get_info", **kwargs)
+
+    return _patch_get_info
+
+
+# Patches everything get_flights and get_checkin_info do around retrieving the reservations
+def _patch_flight_retrieval(mocker: MockerFixture) -> SimpleNamespace:
+    # The scheduler mocks are attached to one parent so the order they are called in is recorded
+    scheduler_calls = mock.Mock()
+    scheduler_calls.attach_mock(mocker.patch.object(CheckInScheduler, "start"), "start")
+    scheduler_calls.attach_mock(
+        mocker.patch.object(CheckInScheduler, "close_idle_webdriver"), "close_idle_webdriver"
     )
-    mock_get_reservation_info = mocker.patch.object(Account, "_get_reservation_info")
-    mock_send_new_flight_notifications = mocker.patch.object(
-        Account, "_send_new_flight_notifications"
+
+    return SimpleNamespace(
+        remove_departed_flights=mocker.patch.object(Account, "remove_departed_flights"),
+        send_new_flight_notifications=mocker.patch.object(
+            Account, "_send_new_flight_notifications"
+        ),
+        scheduler_calls=scheduler_calls,
     )
 
+
+def test_get_flights_processes_retrieved_flights(
+    mocker: MockerFixture, patch_get_info: Callable[..., mock.Mock]
+) -> None:
+    patch_get_info(return_value=[{"confirmationNumber": number} for number in CONFIRMATION_NUMBERS])
+    mock_get_all_reservation_info = mocker.patch.object(Account, "_get_all_reservation_info")
+    mocks = _patch_flight_retrieval(mocker)
+
     test_account = Account()
     test_account.get_flights()
 
-    mock_get_reservation_info.assert_has_calls([mock.call("flight1"), mock.call("flight2")])
-    mock_send_new_flight_notifications.asseert_called_once_with(0)
+    mocks.remove_departed_flights.assert_called_once()
+    mock_get_all_reservation_info.assert_called_once_with(list(CONFIRMATION_NUMBERS))
+    mocks.send_new_flight_notifications.assert_called_once_with(0)
+    assert mocks.scheduler_calls.mock_calls == [
+        mock.call.close_idle_webdriver(),
+        mock.call.start(),
+    ]
+
+
+def test_get_flights_flushes_notifications_when_an_error_occurs(
+    mocker: MockerFixture, patch_get_info: Callable[..., mock.Mock]
+) -> None:
+    patch_get_info(side_effect=CheckInError())
+    mock_flush_notifications = mocker.patch.object(Account, "flush_notifications")
+
+    test_account = Account()
+    with pytest.raises(CheckInError):
+        test_account.get_flights()
+
+    mock_flush_notifications.assert_called_once()
 
 
 def test_get_checkin_info_retrives_info_for_one_flight(mocker: MockerFixture) -> None:
     mock_refresh_headers = mocker.patch.object(Account, "refresh_headers")
     mock_get_reservation_info = mocker.patch.object(Account, "_get_reservation_info")
-    mock_send_new_flight_notifications = mocker.patch.object(
-        Account, "_send_new_flight_notifications"
-    )
+    mocks = _patch_flight_retrieval(mocker)
 
     test_account = Account()
     test_account.get_checkin_info("flight1")
 
+    mocks.remove_departed_flights.assert_called_once()
     mock_refresh_headers.assert_called_once()
     mock_get_reservation_info.assert_called_once_with("flight1")
-    mock_send_new_flight_notifications.assert_called_once_with(0)
+    mocks.send_new_flight_notifications.assert_called_once_with(0)
+    assert mocks.scheduler_calls.mock_calls == [
+        mock.call.close_idle_webdriver(),
+        mock.call.start(),
+    ]
+
+
+def test_wait_for_check_ins_waits_for_the_scheduler(mocker: MockerFixture) -> None:
+    mock_scheduler = mock.Mock(spec=CheckInScheduler)
+    mock_close = mocker.patch.object(Account, "close")
+
+    test_account = Account(checkin_scheduler=mock_scheduler)
+    test_account.wait_for_check_ins()
+
+    mock_scheduler.wait.assert_called_once()
+    mock_close.assert_called_once()
+
+
+def test_close_quits_the_webdriver(mocker: MockerFixture) -> None:
+    mock_quit = mocker.patch.object(WebDriver, "quit")
+
+    test_account = Account()
+    test_account._get_webdriver()
+    test_account.close()
+
+    mock_quit.assert_called_once()
 
 
-def test_refresh_headers_sets_new_headers(mocker: MockerFixture) -> None:
-    mocker.patch.object(WebDriver, "get_info", return_value={"test": "headers"})
+def test_close_does_nothing_if_the_webdriver_was_never_used() -> None:
+    test_account = Account()
+    with mock.patch.object(WebDriver, "quit") as mock_quit:
+        test_account.close()
+
+    mock_quit.assert_not_called()
+
+
+def test_refresh_headers_sets_new_headers(patch_get_info: Callable[..., mock.Mock]) -> None:
+    patch_get_info(return_value={"test": "headers"})
 
     test_account = Account()
     test_account.refresh_headers()
@@ -53,6 +145,65 @@ def test_refresh_headers_sets_new_headers(mocker: MockerFixture) -> None:
     assert test_account.headers == {"test": "headers"}
 
 
+def test_account_uses_the_provided_checkin_scheduler() -> None:
+    mock_scheduler = mock.Mock(spec=CheckInScheduler)
+    test_account = Account(checkin_scheduler=mock_scheduler)
+    assert test_account.checkin_scheduler is mock_scheduler
+
+
+def test_account_creates_a_checkin_scheduler_for_itself_by_default() -> None:
+    test_account = Account()
+    assert test_account.checkin_scheduler.account is test_account
+
+
+def test_get_webdriver_reuses_the_same_webdriver() -> None:
+    test_account = Account()
+    assert test_account._get_webdriver() is test_account._get_webdriver()
+
+
+def test_remove_departed_flights_removes_only_departed_flights(mocker: MockerFixture) -> None:
+    mocker.patch.object(Flight, "_get_flight_info")
+    departed_flight = Flight(None, "", {})
+    departed_flight.departure_time = datetime(1999, 12, 31)
+    upcoming_flight = Flight(None, "", {})
+    upcoming_flight.departure_time = datetime(2099, 12, 31)
+
+    test_account = Account()
+    test_account.flights = [departed_flight, upcoming_flight]
+    test_account._scheduled_flights = {
+        test_account._get_flight_key(departed_flight),
+        test_account._get_flight_key(upcoming_flight),
+    }
+    test_account.remove_departed_flights()
+
+    assert test_account.flights == [upcoming_flight]
+    assert test_account._scheduled_flights == {test_account._get_flight_key(upcoming_flight)}
+
+
+def test_get_all_reservation_info_processes_every_reservation_in_order(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(
+        Account, "_fetch_reservation", side_effect=lambda number: {"response": number}
+    )
+    mock_process_reservation = mocker.patch.object(Account, "_process_reservation")
+
+    test_account = Account()
+    test_account._get_all_reservation_info(list(CONFIRMATION_NUMBERS))
+
+    mock_process_reservation.assert_has_calls(
+        [mock.call(number, {"response": number}) for number in CONFIRMATION_NUMBERS]
+    )
+
+
+def test_get_all_reservation_info_does_nothing_when_there_are_no_reservations() -> None:
+    test_account = Account()
+    with mock.patch.object(Account, "_fetch_reservation") as mock_fetch_reservation:
+        test_account._get_all_reservation_info([])
+
+    mock_fetch_reservation.assert_not_called()
+
+
 def test_get_reservation_info_sends_error_notification_when_reservation_retrieval_fails(
     mocker: MockerFixture,
 ) -> None:
@@ -85,71 +236,177 @@ def test_get_reservation_info_schedules_all_flights_under_one_reservation(
         }
     }
     mocker.patch("lib.account.make_request", return_value=flight_info)
-    mock_flight = mocker.patch("lib.account.Flight")
+    mock_flight = mocker.patch("lib.account.Flight", side_effect=[mock.Mock(), mock.Mock()])
+    mock_scheduler = mock.Mock(spec=CheckInScheduler)
 
-    test_account = Account()
+    test_account = Account(checkin_scheduler=mock_scheduler)
     test_account._get_reservation_info("flight1")
 
     assert len(test_account.flights) == 2
     assert mock_flight.call_count == 2
+    assert mock_scheduler.schedule_check_in.call_count == 2
 
 
-def test_send_new_flight_notifications_sends_no_notification_if_no_new_flights_are_scheduled(
+def test_get_reservation_info_does_not_schedule_flights_that_are_already_scheduled(
     mocker: MockerFixture,
 ) -> None:
-    mock_send_notification = mocker.patch.object(Account, "send_notification")
+    flight_info = {"viewReservationViewPage": {"bounds": [{"departureStatus": "WAITING"}]}}
+    mocker.patch("lib.account.make_request", return_value=flight_info)
+    mock_scheduler = mock.Mock(spec=CheckInScheduler)
+
+    test_account = Account(checkin_scheduler=mock_scheduler)
+    test_account._get_reservation_info("flight1")
+    test_account._get_reservation_info("flight1")
+
+    assert len(test_account.flights) == 1
+    mock_scheduler.schedule_check_in.assert_called_once()
+
+
+def test_flight_is_scheduled_returns_true_if_flight_is_scheduled(mocker: MockerFixture) -> None:
+    mocker.patch.object(Flight, "_get_flight_info")
+    flight = Flight(None, "", {})
+    flight.departure_time = datetime(1999, 12, 31)
+    flight.departure_airport = "LAX"
+    flight.destination_airport = "MIA"
 
     test_account = Account()
-    test_account._send_new_flight_notifications(0)
+    test_account._scheduled_flights.add((datetime(1999, 12, 31), "LAX", "MIA"))
 
-    mock_send_notification.assert_not_called()
+    assert test_account._flight_is_scheduled(flight)
+
+
+def test_flight_is_scheduled_returns_false_if_flight_is_not_scheduled(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(Flight, "_get_flight_info")
+    flight = Flight(None, "", {})
+    flight.departure_time = datetime(1999, 12, 31)
+    flight.departure_airport = "LAX"
+    flight.destination_airport = "MIA"
+
+    test_account = Account()
+    test_account._scheduled_flights.add((datetime(1999, 12, 31), "LAX", "LHR"))
+
+    assert not test_account._flight_is_scheduled(flight)
 
 
-def test_send_new_flight_notifications_sends_notifications_for_new_flights(
+def test_send_new_flight_notifications_sends_no_notification_if_no_new_flights_are_scheduled(
     mocker: MockerFixture,
 ) -> None:
     mock_send_notification = mocker.patch.object(Account, "send_notification")
-    mock_flight = mocker.patch("lib.account.Flight")
 
     test_account = Account()
-    test_account.flights.append(mock_flight)
     test_account._send_new_flight_notifications(0)
 
+    mock_send_notification.assert_not_called()
+
+
+def test_send_new_flight_notifications_sends_notifications_for_new_flights() -> None:
+    test_account = Account()
+    test_account.flights.append(mock.Mock())
+    with mock.patch.object(Account, "send_notification") as mock_send_notification:
+        test_account._send_new_flight_notifications(0)
+
     assert mock_send_notification.call_args[0][1] == NotificationLevel.INFO
 
 
-def test_send_notification_does_not_send_notifications_if_notication_config_is_empty(
+@pytest.mark.parametrize(
+    ["notification_urls", "notification_level", "level", "expected_calls"],
+    [
+        ([], NotificationLevel.INFO, None, 0),
+        (["url"], NotificationLevel.ERROR, NotificationLevel.INFO, 0),
+        (["url"], NotificationLevel.INFO, NotificationLevel.INFO, 1),
+        (["url"], NotificationLevel.ERROR, None, 1),
+    ],
+)
+def test_send_notification_only_sends_notifications_when_configured_for_the_level(
     mocker: MockerFixture,
+    notification_urls: List[str],
+    notification_level: NotificationLevel,
+    level: Optional[NotificationLevel],
+    expected_calls: int,
 ) -> None:
     mock_apprise_notify = mocker.patch.object(apprise.Apprise, "notify")
     test_account = Account()
-    test_account.config.notification_urls = []  # Just in case it isn't empty
+    test_account.config.notification_urls = notification_urls
+    test_account.config.notification_level = notification_level
 
-    test_account.send_notification("")
+    test_account.send_notification("test notification", level)
 
-    mock_apprise_notify.assert_not_called()
+    expected_call = mock.call(
+        title="Auto Southwest Check-in Script",
+        body="test notification",
+        body_format=apprise.NotifyFormat.TEXT,
+    )
+    assert mock_apprise_notify.call_args_list == [expected_call] * expected_calls
 
 
-def test_send_nofication_does_not_send_notifications_if_level_is_too_low(
+def test_send_notification_batches_notifications_while_retrieving_flights(
     mocker: MockerFixture,
 ) -> None:
     mock_apprise_notify = mocker.patch.object(apprise.Apprise, "notify")
     test_account = Account()
     test_account.config.notification_urls = ["url"]
-    test_account.config.notification_level = 2
+    test_account._notification_batch = []
 
-    test_account.send_notification("", 1)
+    test_account.send_notification("test notification", 1)
 
     mock_apprise_notify.assert_not_called()
+    assert test_account._notification_batch == [("test notification", 1)]
 
 
-def test_send_notification_sends_notifications_with_the_correct_content(
+def test_flush_notifications_sends_all_batched_notifications_at_once(
     mocker: MockerFixture,
 ) -> None:
     mock_apprise_notify = mocker.patch.object(apprise.Apprise, "notify")
     test_account = Account()
     test_account.config.notification_urls = ["url"]
+    test_account._notification_batch = [
+        ("info", NotificationLevel.INFO),
+        ("error", NotificationLevel.ERROR),
+    ]
 
-    test_account.send_notification("test notification", 1)
+    test_account.flush_notifications()
+
+    mock_apprise_notify.assert_called_once()
+    assert mock_apprise_notify.call_args[1]["body"] == "error\ninfo"
+    assert test_account._notification_batch is None
+
+
+def test_flush_notifications_does_not_send_anything_when_no_notifications_are_batched(
+    mocker: MockerFixture,
+) -> None:
+    mock_apprise_notify = mocker.patch.object(apprise.Apprise, "notify")
+    test_account = Account()
+    test_account._notification_batch = []
+
+    test_account.flush_notifications()
+
+    mock_apprise_notify.assert_not_called()
+    assert test_account._notification_batch is None
+
+
+def test_get_apprise_reuses_the_apprise_object(mocker: MockerFixture) -> None:
+    mock_apprise = mocker.patch("apprise.Apprise")
+    test_account = Account()
+    test_account.config.notification_urls = ["url"]
+
+    test_account._get_apprise()
+    test_account._get_apprise()
+
+    mock_apprise.assert_called_once_with(["url"])
+
+
+def test_get_apprise_rebuilds_the_apprise_object_when_the_urls_change(
+    mocker: MockerFixture,
+) -> None:
+    mock_apprise = mocker.patch("apprise.Apprise")
+    test_account = Account()
+    test_account.config.notification_urls = ["url"]
+    test_account._get_apprise()
+
+    test_account.config.notification_urls.append("url2")
+    test_account._get_apprise()
 
-    assert mock_apprise_notify.call_args[1]["body"] == "test notification"
+    assert mock_apprise.call_count == 2
+    mock_apprise.assert_called_with(["url", "url2"])
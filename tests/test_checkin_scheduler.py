@@ -0,0 +1,309 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lib.account import Account
+from lib.checkin_scheduler import CheckInScheduler
+from lib.general import NotificationLevel
+
+# This needs to be accessed to be tested
+# pylint: disable=protected-access
+
+# These tests replace threading.Thread and time.time, so they are kept on one worker
+# even if the tests are ever distributed by group instead of by file
+pytestmark = pytest.mark.xdist_group("threads")
+
+
+@pytest.fixture
+def test_scheduler() -> CheckInScheduler:
+    return CheckInScheduler(Account())
+
+
+# The current time starts at the epoch and can be changed by setting the return value
+@pytest.fixture
+def frozen_time(mocker: MockerFixture) -> mock.Mock:
+    return mocker.patch("time.time", return_value=0)
+
+
+@pytest.fixture
+def mock_flight() -> mock.Mock:
+    flight = mock.Mock()
+    flight.checkin_time = datetime(1999, 12, 31, 23, 29, 59)
+    return flight
+
+
+# Runs every scheduled event in order right away instead of waiting until its time
+def run_scheduled_events(test_scheduler: CheckInScheduler) -> None:
+    for event in test_scheduler.scheduler.queue:
+        test_scheduler.scheduler.cancel(event)
+        event.action(*event.argument)
+
+
+def test_schedule_check_in_checks_in_immediately_if_checkin_time_has_passed(
+    frozen_time: mock.Mock, test_scheduler: CheckInScheduler, mock_flight: mock.Mock
+) -> None:
+    frozen_time.return_value = CheckInScheduler._get_timestamp(datetime(2000, 1, 1))
+
+    test_scheduler.schedule_check_in(mock_flight)
+
+    assert len(test_scheduler.scheduler.queue) == 1
+    event = test_scheduler.scheduler.queue[0]
+    assert event.action == test_scheduler._check_in
+    assert event.argument == (mock_flight,)
+
+
+def test_schedule_check_in_does_not_refresh_headers_when_check_in_is_less_than_ten_minutes_away(
+    frozen_time: mock.Mock, test_scheduler: CheckInScheduler, mock_flight: mock.Mock
+) -> None:
+    frozen_time.return_value = CheckInScheduler._get_timestamp(datetime(1999, 12, 31, 23, 19, 59))
+
+    test_scheduler.schedule_check_in(mock_flight)
+
+    assert len(test_scheduler.scheduler.queue) == 1
+    event = test_scheduler.scheduler.queue[0]
+    assert event.time == CheckInScheduler._get_timestamp(mock_flight.checkin_time)
+    assert event.action == test_scheduler._check_in
+
+
+def test_schedule_check_in_refreshes_headers_ten_minutes_before_check_in(
+    mocker: MockerFixture,
+    frozen_time: mock.Mock,
+    test_scheduler: CheckInScheduler,
+    mock_flight: mock.Mock,
+) -> None:
+    frozen_time.return_value = CheckInScheduler._get_timestamp(datetime(1999, 12, 31, 18, 29, 59))
+    mock_schedule_refresh = mocker.patch.object(CheckInScheduler, "_schedule_refresh")
+
+    test_scheduler.schedule_check_in(mock_flight)
+
+    mock_schedule_refresh.assert_called_once_with(
+        CheckInScheduler._get_timestamp(datetime(1999, 12, 31, 23, 19, 59))
+    )
+    assert len(test_scheduler.scheduler.queue) == 1
+    event = test_scheduler.scheduler.queue[0]
+    assert event.time == CheckInScheduler._get_timestamp(mock_flight.checkin_time)
+    assert event.action == test_scheduler._check_in
+
+
+def test_start_runs_the_scheduler_in_a_thread(test_scheduler: CheckInScheduler) -> None:
+    with mock.patch("threading.Thread") as mock_thread:
+        test_scheduler.start()
+
+    mock_thread.assert_called_once_with(target=test_scheduler.scheduler.run, daemon=True)
+    mock_thread.return_value.start.assert_called_once()
+
+
+def test_start_does_not_start_another_thread_if_the_scheduler_is_running(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler.thread = mock.Mock()
+    test_scheduler.thread.is_alive.return_value = True
+
+    with mock.patch("threading.Thread") as mock_thread:
+        test_scheduler.start()
+
+    mock_thread.assert_not_called()
+
+
+@pytest.mark.parametrize("thread_count", [0, 1, 2, 8])
+def test_wait_waits_for_the_scheduler_and_every_check_in(
+    test_scheduler: CheckInScheduler, thread_count: int
+) -> None:
+    test_scheduler.thread = mock.Mock()
+    test_scheduler.checkin_threads = [mock.Mock() for _ in range(thread_count)]
+
+    test_scheduler.wait()
+
+    test_scheduler.thread.join.assert_called_once()
+    for thread in test_scheduler.checkin_threads:
+        thread.join.assert_called_once()
+
+
+def test_wait_returns_immediately_if_the_scheduler_was_never_started(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler.wait()
+    assert test_scheduler.thread is None
+
+
+@pytest.mark.usefixtures("frozen_time")
+def test_close_idle_webdriver_closes_the_webdriver_when_no_refresh_is_coming_up(
+    mocker: MockerFixture, test_scheduler: CheckInScheduler
+) -> None:
+    mock_close = mocker.patch.object(Account, "close")
+    test_scheduler.refresh_events = [mock.Mock(time=31 * 60)]
+
+    test_scheduler.close_idle_webdriver()
+
+    mock_close.assert_called_once()
+
+
+@pytest.mark.usefixtures("frozen_time")
+def test_close_idle_webdriver_keeps_the_webdriver_open_when_a_refresh_is_coming_up(
+    mocker: MockerFixture, test_scheduler: CheckInScheduler
+) -> None:
+    mock_close = mocker.patch.object(Account, "close")
+    test_scheduler.refresh_events = [mock.Mock(time=31 * 60), mock.Mock(time=30 * 60)]
+
+    test_scheduler.close_idle_webdriver()
+
+    mock_close.assert_not_called()
+
+
+def test_schedule_refresh_schedules_a_refresh_when_none_are_pending(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler._schedule_refresh(60)
+
+    assert len(test_scheduler.scheduler.queue) == 1
+    event = test_scheduler.scheduler.queue[0]
+    assert event.time == 60
+    assert event.action == test_scheduler._refresh_headers
+    assert test_scheduler.refresh_events == [event]
+
+
+def test_schedule_refresh_reuses_a_refresh_scheduled_shortly_before(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler._schedule_refresh(60)
+    test_scheduler._schedule_refresh(60 + 15 * 60)
+
+    assert len(test_scheduler.scheduler.queue) == 1
+    assert len(test_scheduler.refresh_events) == 1
+
+
+def test_schedule_refresh_replaces_a_refresh_scheduled_shortly_after(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler._schedule_refresh(60 + 15 * 60)
+    test_scheduler._schedule_refresh(60)
+
+    assert len(test_scheduler.scheduler.queue) == 1
+    event = test_scheduler.scheduler.queue[0]
+    assert event.time == 60
+    assert test_scheduler.refresh_events == [event]
+    assert test_scheduler.latest_refreshes == {60: 60 + 15 * 60}
+
+
+def test_schedule_refresh_keeps_a_later_refresh_covering_check_ins_outside_of_the_refresh_window(
+    test_scheduler: CheckInScheduler,
+) -> None:
+    test_scheduler._schedule_refresh(60 + 10 * 60)
+    test_scheduler._schedule_refresh(60 + 20 * 60)
+    test_scheduler._schedule_refresh(60)
+
+    assert len(test_scheduler.scheduler.queue) == 2
+    assert [event.time for event in test_scheduler.refresh_events] == [60, 60 + 10 * 60]
+
+
+@pytest.mark.parametrize("refresh_timestamp", [60 + 15 * 60 + 1, 59 - 15 * 60])
+def test_schedule_refresh_schedules_another_refresh_outside_of_the_refresh_window(
+    test_scheduler: CheckInScheduler, refresh_timestamp: float
+) -> None:
+    test_scheduler._schedule_refresh(60)
+    test_scheduler._schedule_refresh(refresh_timestamp)
+
+    assert len(test_scheduler.scheduler.queue) == 2
+    assert len(test_scheduler.refresh_events) == 2
+
+
+def test_refresh_headers_refreshes_the_account_headers(
+    mocker: MockerFixture, test_scheduler: CheckInScheduler
+) -> None:
+    mock_refresh_headers = mocker.patch.object(Account, "refresh_headers")
+    mock_close_idle_webdriver = mocker.patch.object(CheckInScheduler, "close_idle_webdriver")
+    test_scheduler._schedule_refresh(60 + 15 * 60)
+    test_scheduler._schedule_refresh(59)
+
+    test_scheduler._refresh_headers()
+
+    mock_refresh_headers.assert_called_once()
+    mock_close_idle_webdriver.assert_called_once()
+    assert len(test_scheduler.refresh_events) == 1
+    assert test_scheduler.refresh_events[0].time == 60 + 15 * 60
+
+
+def test_refresh_headers_sends_error_notification_when_the_refresh_fails(
+    mocker: MockerFixture, test_scheduler: CheckInScheduler
+) -> None:
+    mocker.patch.object(Account, "refresh_headers", side_effect=Exception("timeout"))
+    mock_send_notification = mocker.patch.object(Account, "send_notification")
+    mock_close_idle_webdriver = mocker.patch.object(CheckInScheduler, "close_idle_webdriver")
+    test_scheduler._schedule_refresh(60)
+
+    test_scheduler._refresh_headers()
+
+    mock_send_notification.assert_called_once()
+    assert mock_send_notification.call_args[0][1] == NotificationLevel.ERROR
+    mock_close_idle_webdriver.assert_called_once()
+    assert test_scheduler.refresh_events == []
+
+
+def test_scheduler_still_checks_in_after_a_failed_refresh(
+    mocker: MockerFixture,
+    frozen_time: mock.Mock,
+    test_scheduler: CheckInScheduler,
+    mock_flight: mock.Mock,
+) -> None:
+    mocker.patch.object(Account, "refresh_headers", side_effect=Exception("timeout"))
+    mocker.patch.object(Account, "send_notification")
+    mocker.patch.object(CheckInScheduler, "close_idle_webdriver")
+    mock_thread = mocker.patch("threading.Thread")
+    test_scheduler.schedule_check_in(mock_flight)
+
+    # The refresh and the check in are both due, so the real scheduler runs them in order
+    frozen_time.return_value = CheckInScheduler._get_timestamp(datetime(2000, 1, 1))
+    test_scheduler.scheduler.run(blocking=False)
+
+    mock_thread.assert_called_once_with(target=mock_flight._check_in, daemon=True)
+    assert test_scheduler.scheduler.empty()
+
+
+def test_check_in_checks_in_to_the_flight_in_a_new_thread(
+    test_scheduler: CheckInScheduler, mock_flight: mock.Mock
+) -> None:
+    with mock.patch("threading.Thread") as mock_thread:
+        test_scheduler._check_in(mock_flight)
+
+    mock_thread.assert_called_once_with(target=mock_flight._check_in, daemon=True)
+    mock_thread.return_value.start.assert_called_once()
+    assert test_scheduler.checkin_threads == [mock_thread.return_value]
+
+
+def test_get_timestamp_treats_the_time_as_utc() -> None:
+    assert CheckInScheduler._get_timestamp(datetime(1970, 1, 1, 0, 1)) == 60
+
+
+@pytest.mark.usefixtures("frozen_time")
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize(["flight_count", "expected_refreshes"], [(1, 1), (4, 1), (8, 2), (16, 4)])
+def test_scheduled_check_ins_share_header_refreshes(
+    mocker: MockerFixture,
+    test_scheduler: CheckInScheduler,
+    flight_count: int,
+    expected_refreshes: int,
+    reverse: bool,
+) -> None:
+    mock_refresh_headers = mocker.patch.object(Account, "refresh_headers")
+    mocker.patch.object(CheckInScheduler, "close_idle_webdriver")
+    mock_thread = mocker.patch("threading.Thread")
+
+    # Check ins are five minutes apart, so every refresh can cover four of them. They are also
+    # scheduled latest first because reservations aren't always in departure order.
+    checkin_minutes = range(0, flight_count * 5, 5)
+    if reverse:
+        checkin_minutes = reversed(checkin_minutes)
+
+    for minutes in checkin_minutes:
+        flight = mock.Mock()
+        flight.checkin_time = datetime(1970, 1, 2) + timedelta(minutes=minutes)
+        test_scheduler.schedule_check_in(flight)
+
+    run_scheduled_events(test_scheduler)
+
+    assert mock_refresh_headers.call_count == expected_refreshes
+    assert mock_thread.return_value.start.call_count == flight_count
+    assert test_scheduler.refresh_events == []
+    assert test_scheduler.latest_refreshes == {}
@@ -1,3 +1,4 @@
+import copy
 import os
 from typing import Any, Dict
 
@@ -44,8 +45,11 @@ def test_get_config_returns_empty_config_when_file_is_not_found(mocker: MockerFi
     "config_content",
     [{"notification_urls": None}, {"notification_level": "invalid"}],
 )
-def test_parse_config_raises_exception_with_invalid_entries(config_content: Dict[str, Any]) -> None:
-    test_config = config.Config()
+def test_parse_config_raises_exception_with_invalid_entries(
+    config_prototype: config.Config, config_content: Dict[str, Any]
+) -> None:
+    # The invalid value is set before the exception is raised, so every case gets its own copy
+    test_config = copy.copy(config_prototype)
 
     with pytest.raises(TypeError):
         test_config._parse_config(config_content)
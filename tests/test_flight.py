@@ -1,11 +1,13 @@
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 from unittest import mock
 
 import pytest
 import pytz
 from pytest_mock import MockerFixture
 
+from lib import flight
 from lib.account import Account
 from lib.flight import TZ_FILE_PATH, Flight
 from lib.general import CheckInError, NotificationLevel
@@ -13,10 +15,22 @@ from lib.general import CheckInError, NotificationLevel
 # This needs to be accessed to be tested
 # pylint: disable=protected-access
 
+# None of the tests modify the flight info, so it is shared between them
+FLIGHT_INFO = {
+    "departureDate": "12-31-99",
+    "departureTime": "23:59:59",
+    "departureAirport": {"code": "999"},
+}
+
+
+# Flight times are cached between tests otherwise
+@pytest.fixture(autouse=True)
+def clear_utc_time_cache() -> None:
+    Flight._get_utc_time.cache_clear()
+
 
 @pytest.fixture
-def test_flight(mocker: MockerFixture) -> Flight:
-    mocker.patch("multiprocessing.Process.start")
+def test_flight() -> Flight:
     account = Account()
 
     # Needs to be mocked so it isn't run when Flight is instantiated
@@ -25,14 +39,15 @@ def test_flight(mocker: MockerFixture) -> Flight:
 
 
 def test_get_flight_info_sets_the_correct_info(mocker: MockerFixture, test_flight: Flight) -> None:
-    mocker.patch.object(Flight, "_get_flight_time", return_value="12:31:05")
+    mocker.patch.object(Flight, "_get_flight_time", return_value=datetime(1999, 12, 31, 18, 29))
     test_flight._get_flight_info(
         {"departureAirport": {"name": "LAX"}, "arrivalAirport": {"name": "LHR"}}
     )
 
     assert test_flight.departure_airport == "LAX"
     assert test_flight.destination_airport == "LHR"
-    assert test_flight.departure_time == "12:31:05"
+    assert test_flight.departure_time == datetime(1999, 12, 31, 18, 29)
+    assert test_flight.checkin_time == datetime(1999, 12, 30, 18, 28, 59)
 
 
 def test_get_flight_time_returns_the_correct_time(
@@ -43,88 +58,101 @@ def test_get_flight_time_returns_the_correct_time(
     )
     mock_convert_to_utc = mocker.patch.object(Flight, "_convert_to_utc", return_value="12:31:05")
 
-    flight_info = {
-        "departureDate": "12-31-99",
-        "departureTime": "23:59:59",
-        "departureAirport": {"code": "999"},
-    }
-    flight_time = test_flight._get_flight_time(flight_info)
+    flight_time = test_flight._get_flight_time(FLIGHT_INFO)
 
     mock_get_airport_tz.assert_called_once_with("999")
     mock_convert_to_utc.assert_called_once_with("12-31-99 23:59:59", "Asia/Calcutta")
     assert flight_time == "12:31:05"
 
 
-def test_get_airport_timezone_returns_the_correct_timezone(
+def test_get_flight_time_only_converts_the_same_flight_time_once(
     mocker: MockerFixture, test_flight: Flight
 ) -> None:
+    mocker.patch.object(Flight, "_get_airport_timezone", return_value="Asia/Calcutta")
+    mock_convert_to_utc = mocker.patch.object(Flight, "_convert_to_utc", return_value="12:31:05")
+
+    test_flight._get_flight_time(FLIGHT_INFO)
+    flight_time = test_flight._get_flight_time(FLIGHT_INFO)
+
+    mock_convert_to_utc.assert_called_once()
+    assert flight_time == "12:31:05"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_load_airport_timezones_reads_the_timezone_file(
+    mocker: MockerFixture, use_orjson: bool
+) -> None:
+    if not use_orjson:
+        mocker.patch("lib.flight.orjson", None)
+
     # Needs to be mocked within the flight module because pytz opens a file as well
     mock_open = mocker.patch(
-        "lib.flight.open", mock.mock_open(read_data='{"test_code": "Asia/Calcutta"}')
+        "lib.flight.open", mock.mock_open(read_data=b'{"test_code": "Asia/Calcutta"}')
     )
-    timezone = test_flight._get_airport_timezone("test_code")
+    airport_timezones = flight._load_airport_timezones()
 
-    assert timezone == pytz.timezone("Asia/Calcutta")
+    assert airport_timezones == {"test_code": "Asia/Calcutta"}
     mock_open.assert_called_once_with(
-        os.path.dirname(os.path.dirname(__file__)) + "/" + TZ_FILE_PATH
+        os.path.dirname(os.path.dirname(__file__)) + "/" + TZ_FILE_PATH, "rb"
     )
 
 
-def test_convert_to_utc_converts_local_time_to_utc(test_flight: Flight) -> None:
-    tz = pytz.timezone("Asia/Calcutta")
-    utc_flight_time = test_flight._convert_to_utc("1999-12-31 23:59", tz)
-
-    assert utc_flight_time == datetime(1999, 12, 31, 18, 29)
-
-
-def test_set_check_in_correctly_sets_up_check_in_process(
+def test_get_airport_timezone_returns_the_correct_timezone(
     mocker: MockerFixture, test_flight: Flight
 ) -> None:
-    test_flight.departure_time = datetime(1999, 12, 31, 18, 29)
-    mock_wait_for_check_in = mocker.patch.object(Flight, "_wait_for_check_in")
-    mock_check_in = mocker.patch.object(Flight, "_check_in")
-
-    test_flight._set_check_in()
+    mocker.patch.dict(flight.AIRPORT_TIMEZONES, {"test_code": "Asia/Calcutta"})
+    timezone = test_flight._get_airport_timezone("test_code")
 
-    mock_wait_for_check_in.assert_called_once_with(datetime(1999, 12, 30, 18, 28, 55))
-    mock_check_in.assert_called_once()
+    assert timezone == pytz.timezone("Asia/Calcutta")
 
 
-def test_wait_for_check_in_exits_immediately_if_checkin_time_has_passed(
+def test_get_airport_timezone_does_not_reopen_the_timezone_file(
     mocker: MockerFixture, test_flight: Flight
 ) -> None:
-    mock_sleep = mocker.patch("time.sleep")
-    test_flight._wait_for_check_in(datetime(1999, 12, 31))
-    mock_sleep.assert_not_called()
-
-
-def test_wait_for_check_in_sleeps_once_when_check_in_is_less_than_ten_minutes_away(
-    mocker: MockerFixture, test_flight: Flight
+    mock_open = mocker.patch("lib.flight.open")
+    test_flight._get_airport_timezone("LAX")
+
+    mock_open.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ["timezone", "expected_offset"],
+    [
+        ("America/Phoenix", timedelta(hours=-7)),
+        ("Asia/Calcutta", timedelta(hours=5, minutes=30)),
+        ("UTC", timedelta(0)),
+        ("America/Los_Angeles", None),
+    ],
+)
+def test_get_constant_offset_only_returns_an_offset_for_timezones_without_future_transitions(
+    timezone: str, expected_offset: Optional[timedelta]
 ) -> None:
-    mock_sleep = mocker.patch("time.sleep")
-    mock_datetime = mocker.patch("lib.flight.datetime")
-    mock_datetime.utcnow.return_value = datetime(1999, 12, 31, 18, 29, 59)
+    assert flight._get_constant_offset(pytz.timezone(timezone)) == expected_offset
+
 
-    test_flight._wait_for_check_in(datetime(1999, 12, 31, 18, 39, 59))
+def test_convert_to_utc_converts_local_time_to_utc(test_flight: Flight) -> None:
+    tz = pytz.timezone("Asia/Calcutta")
+    utc_flight_time = test_flight._convert_to_utc("1999-12-31 23:59", tz)
 
-    mock_sleep.assert_called_once_with(600)
+    assert utc_flight_time == datetime(1999, 12, 31, 18, 29)
 
 
-def test_wait_for_check_in_refreshes_headers_ten_minutes_before_check_in(
-    mocker: MockerFixture, test_flight: Flight
+@pytest.mark.parametrize(
+    ["flight_date", "expected_time"],
+    [
+        ("2022-03-13 01:59", datetime(2022, 3, 13, 9, 59)),
+        ("2022-03-13 02:30", datetime(2022, 3, 13, 10, 30)),
+        ("2022-03-13 03:00", datetime(2022, 3, 13, 10)),
+        ("2022-11-06 01:30", datetime(2022, 11, 6, 9, 30)),
+    ],
+)
+def test_convert_to_utc_handles_daylight_saving_time_changes(
+    test_flight: Flight, flight_date: str, expected_time: datetime
 ) -> None:
-    mock_sleep = mocker.patch("time.sleep")
-    mock_refresh_headers = mocker.patch.object(Account, "refresh_headers")
-    mock_datetime = mocker.patch("lib.flight.datetime")
-    mock_datetime.utcnow.side_effect = [
-        datetime(1999, 12, 31, 18, 29, 59),
-        datetime(1999, 12, 31, 23, 19, 59),
-    ]
-
-    test_flight._wait_for_check_in(datetime(1999, 12, 31, 23, 29, 59))
-
-    mock_sleep.assert_has_calls([mock.call(17400), mock.call(600)])
-    mock_refresh_headers.assert_called_once()
+    tz = pytz.timezone("America/Los_Angeles")
+    utc_flight_time = test_flight._convert_to_utc(flight_date, tz)
+
+    assert utc_flight_time == expected_time
 
 
 def test_check_in_sends_error_notification_when_check_in_fails(
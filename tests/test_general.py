@@ -1,3 +1,5 @@
+from typing import List
+
 import pytest
 import requests_mock
 from pytest_mock import MockerFixture
@@ -6,14 +8,15 @@ from lib import general
 
 
 def test_make_request_raises_exception_on_failure(
-    requests_mock: requests_mock.mocker.Mocker, mocker: MockerFixture
+    requests_mock: requests_mock.mocker.Mocker, sleep_calls: List[float]
 ) -> None:
-    mocker.patch("time.sleep")
     requests_mock.post(general.BASE_URL + "test", status_code=400, reason="error")
 
     with pytest.raises(general.CheckInError):
         general.make_request("POST", "test", {}, {})
 
+    assert sleep_calls == [0.1] * 2000
+
 
 def test_make_request_correctly_posts_data(requests_mock: requests_mock.mocker.Mocker) -> None:
     mock_post = requests_mock.post(
@@ -44,3 +47,24 @@ def test_make_request_correctly_gets_data(requests_mock: requests_mock.mocker.Mo
     assert last_request.method == "GET"
     assert last_request.url == general.BASE_URL + "test?test=params"
     assert last_request.headers["header"] == "test"
+
+
+def test_make_request_uses_the_session_when_one_is_provided(
+    requests_mock: requests_mock.mocker.Mocker, mocker: MockerFixture
+) -> None:
+    requests_mock.get(general.BASE_URL + "test", status_code=200, text='{"success": "get"}')
+    session = general.create_session()
+    mock_get = mocker.spy(session, "get")
+
+    response = general.make_request("GET", "test", {}, {}, session)
+
+    assert response == {"success": "get"}
+    mock_get.assert_called_once()
+
+
+def test_create_session_reuses_connections_and_retries_failed_connections() -> None:
+    session = general.create_session()
+    adapter = session.get_adapter(general.BASE_URL)
+
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == 2
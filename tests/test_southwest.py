@@ -24,11 +24,13 @@ def test_set_up_retrieves_flights_when_a_username_and_password_are_provided(
 ) -> None:
     mock_account = mocker.patch.object(Account, "__init__", return_value=None)
     mock_get_flights = mocker.patch.object(Account, "get_flights")
+    mock_wait_for_check_ins = mocker.patch.object(Account, "wait_for_check_ins")
 
     southwest.set_up(["username", "password"])
 
     mock_account.assert_called_once_with("username", "password")
     mock_get_flights.assert_called_once()
+    mock_wait_for_check_ins.assert_called_once()
 
 
 def test_set_up_retrieves_flight_info_when_a_confirmation_number_and_name_are_provided(
@@ -36,11 +38,13 @@ def test_set_up_retrieves_flight_info_when_a_confirmation_number_and_name_are_pr
 ) -> None:
     mock_account = mocker.patch.object(Account, "__init__", return_value=None)
     mock_get_checkin_info = mocker.patch.object(Account, "get_checkin_info")
+    mock_wait_for_check_ins = mocker.patch.object(Account, "wait_for_check_ins")
 
     southwest.set_up(["000000", "first", "last"])
 
     mock_account.assert_called_once_with(first_name="first", last_name="last")
     mock_get_checkin_info.assert_called_once_with("000000")
+    mock_wait_for_check_ins.assert_called_once()
 
 
 @pytest.mark.parametrize("arguments", [[], ["1"], ["1", "2", "3", "4"]])
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 from unittest import mock
 
 import pytest
@@ -32,22 +32,52 @@ def test_get_info_gets_account_info_when_an_account_is_provided(mocker: MockerFi
     assert info == "Account info"
 
 
-def test_get_checkin_info_returns_request_headers(
+def test_get_info_reuses_the_browser_between_calls(
     mocker: MockerFixture, mock_driver: mock.Mock
+) -> None:
+    mocker.patch.object(WebDriver, "_get_checkin_info")
+
+    webdriver = WebDriver()
+    webdriver.get_info()
+    # Requests are cleared on every call, so the mock needs them to be set again
+    mock_driver.return_value.requests = []
+    webdriver.get_info()
+
+    mock_driver.assert_called_once()
+    mock_driver.return_value.quit.assert_not_called()
+
+
+def test_quit_closes_the_browser(mocker: MockerFixture, mock_driver: mock.Mock) -> None:
+    mocker.patch.object(WebDriver, "_get_checkin_info")
+
+    webdriver = WebDriver()
+    webdriver.get_info()
+    webdriver.quit()
+
+    mock_driver.return_value.quit.assert_called_once()
+    assert webdriver.driver is None
+
+
+def test_quit_does_nothing_if_the_browser_was_never_started(mock_driver: mock.Mock) -> None:
+    WebDriver().quit()
+    mock_driver.return_value.quit.assert_not_called()
+
+
+def test_get_checkin_info_returns_request_headers(
+    mocker: MockerFixture, mock_driver: mock.Mock, sleep_calls: List[float]
 ) -> None:
     mocker.patch("lib.webdriver.WebDriverWait")
-    mocker.patch("time.sleep")
     mocker.patch.object(WebDriver, "_get_needed_headers", return_value="test_headers")
 
     headers = WebDriver()._get_checkin_info(mock_driver)
     assert headers == "test_headers"
+    assert sleep_calls == [10]
 
 
 def test_get_account_info_sets_account_name_when_it_is_not_set(
-    mocker: MockerFixture, mock_driver: mock.Mock
+    mocker: MockerFixture, mock_driver: mock.Mock, sleep_calls: List[float]
 ) -> None:
     mocker.patch("lib.webdriver.WebDriverWait")
-    mocker.patch("time.sleep")
     mocker.patch.object(WebDriver, "_get_needed_headers", return_value="test_headers")
     mock_set_account_name = mocker.patch.object(WebDriver, "_set_account_name")
 
@@ -67,13 +97,13 @@ def test_get_account_info_sets_account_name_when_it_is_not_set(
     assert account.headers == "test_headers"
     mock_set_account_name.assert_called_once_with(account, {"name": "John Doe"})
     assert flights == "new flights"
+    assert sleep_calls == [10]
 
 
 def test_get_account_info_does_not_set_account_name_when_it_is_already_set(
     mocker: MockerFixture, mock_driver: mock.Mock
 ) -> None:
     mocker.patch("lib.webdriver.WebDriverWait")
-    mocker.patch("time.sleep")
     mocker.patch.object(WebDriver, "_get_needed_headers", return_value="test_headers")
     mock_set_account_name = mocker.patch.object(WebDriver, "_set_account_name")
 